@@ -191,77 +191,98 @@ async def initialize_database():
     
     created_users = []
     created_employees = []
+    users_docs = []
+    employees_docs = []
+    balances_docs = []
+    sick_docs = []
     
-    # Create users and employees
-    for user_data in sample_users:
+    # Hash all passwords concurrently off the event loop
+    hashed = await asyncio.gather(
+        *[asyncio.to_thread(hash_password, u["password"]) for u in sample_users]
+    )
+    
+    # Single seed moment shared by all sample records
+    now = datetime.utcnow()
+    created = now - timedelta(days=30)
+    hired = now - timedelta(days=90)
+    
+    # Create users and employees (trusted sample data, built without validation)
+    for user_data, password_hash in zip(sample_users, hashed):
         # Create user account
-        user = User(
+        user = User.model_construct(
             email=user_data["email"],
-            password_hash=hash_password(user_data["password"]),
+            password_hash=password_hash,
             role=user_data["role"],
-            created_at=datetime.utcnow() - timedelta(days=30)  # Created 30 days ago
+            created_at=created  # Created 30 days ago
         )
         
-        await db.users.insert_one(user.dict())
+        users_docs.append(user.to_mongo())
         created_users.append(user)
         
         # Create employee record
-        employee = Employee(
+        employee = Employee.model_construct(
             user_id=user.id,
             full_name=user_data["full_name"],
             email=user_data["email"],
             department=user_data["department"],
             position=user_data["position"],
-            hire_date=datetime.utcnow() - timedelta(days=90),  # Hired 90 days ago
+            hire_date=hired,  # Hired 90 days ago
             phone_number=user_data["phone"],
             initial_leave_balance=20.0,  # 20 days initial leave
             created_by="system",
-            created_at=datetime.utcnow() - timedelta(days=30)
+            created_at=created
         )
         
-        await db.employees.insert_one(employee.dict())
+        employees_docs.append(employee.to_mongo())
         created_employees.append(employee)
         
         # Create leave balance records
-        current_date = datetime.utcnow()
-        leave_balance = LeaveBalance(
+        leave_balance = LeaveBalance.model_construct(
             employee_id=employee.id,
-            year=current_date.year,
-            month=current_date.month,
+            year=now.year,
+            month=now.month,
             opening_balance=20.0,
             leave_taken=0.0,
             hr_adjustments=0.0,
             closing_balance=20.0,
-            created_at=datetime.utcnow() - timedelta(days=30)
+            created_at=created
         )
         
-        await db.leave_balances.insert_one(leave_balance.dict())
+        balances_docs.append(leave_balance.to_mongo())
         
         # Create sick days record
-        sick_days = SickDays(
+        sick_days = SickDays.model_construct(
             employee_id=employee.id,
-            year=current_date.year,
+            year=now.year,
             used_days=0,
             total_allowed=3,
-            last_reset=datetime.utcnow() - timedelta(days=30)
+            last_reset=created
         )
         
-        await db.sick_days.insert_one(sick_days.dict())
+        sick_docs.append(sick_days.to_mongo())
+    
+    # Bulk insert all records, one concurrent round-trip per collection
+    await asyncio.gather(
+        db.users.insert_many(users_docs, ordered=False),
+        db.employees.insert_many(employees_docs, ordered=False),
+        db.leave_balances.insert_many(balances_docs, ordered=False),
+        db.sick_days.insert_many(sick_docs, ordered=False)
+    )
     
     # Create some sample audit logs
     audit_logs = [
-        AuditLog(
+        AuditLog.model_construct(
             user_id=created_users[0].id,  # Admin
             action="SYSTEM_INITIALIZATION",
             target_type="system",
             target_id="database",
             details={"message": "Database initialized with sample data"},
-            timestamp=datetime.utcnow()
+            timestamp=now
         )
     ]
     
     for log in audit_logs:
-        await db.audit_logs.insert_one(log.dict())
+        await db.audit_logs.insert_one(log.to_mongo())
     
     print("✅ Sample data created successfully!")
     print(f"📊 Created {len(created_users)} users and {len(created_employees)} employees")
@@ -0,0 +1,113 @@
+import asyncio
+import os
+from pathlib import Path
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+COLLECTIONS = [
+    "users",
+    "employees",
+    "leave_balances",
+    "leave_adjustments",
+    "sick_days",
+    "audit_logs",
+]
+
+# Fields holding the string id of another document
+REFERENCE_FIELDS = ["user_id", "employee_id", "created_by", "adjusted_by", "target_id"]
+
+async def migrate_object_ids():
+    """Move documents keyed by a UUID `id` field to ObjectId `_id` keys.
+
+    Every legacy document gets a new ObjectId, and reference fields pointing
+    at legacy ids are rewritten to the new ids' string form. The old UUID is
+    kept on each migrated document as `legacy_id`.
+
+    Each collection is copied to `<name>_pre_objectid` before its first
+    rewrite. Deleting and re-inserting a collection is not atomic, so if a run
+    is interrupted, re-run the script: it reads legacy documents from those
+    backups, reuses the ObjectIds already assigned through `legacy_id`, and
+    only inserts documents that have not been migrated yet.
+    """
+
+    # Connect to MongoDB
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    print("🚀 Migrating WaQteK HR documents to ObjectId keys...")
+
+    existing_collections = await db.list_collection_names()
+    legacy_docs = {}
+    id_map = {}
+    for name in COLLECTIONS:
+        backup = f"{name}_pre_objectid"
+        live_docs = await db[name].find({"id": {"$exists": True}}).to_list(None)
+
+        # Keep a copy of the collection before its first rewrite. An earlier
+        # run's backup is never overwritten, since it may hold documents that
+        # run deleted but did not get to re-insert.
+        if backup not in existing_collections:
+            if not live_docs:
+                continue
+            await db[name].aggregate([{"$out": backup}]).to_list(None)
+
+        docs = await db[backup].find({"id": {"$exists": True}}).to_list(None)
+        legacy_docs[name] = {doc["id"]: doc for doc in docs + live_docs}
+
+        # Reuse the ObjectIds of documents an earlier run already migrated
+        migrated = await db[name].find(
+            {"legacy_id": {"$exists": True}}, {"legacy_id": 1}
+        ).to_list(None)
+        for doc in migrated:
+            id_map[doc["legacy_id"]] = doc["_id"]
+            legacy_docs[name].pop(doc["legacy_id"], None)
+
+    # Assign a new ObjectId to every legacy document still to migrate
+    for docs in legacy_docs.values():
+        for legacy_id in docs:
+            id_map.setdefault(legacy_id, ObjectId())
+
+    if not any(legacy_docs.values()):
+        print("✅ No legacy documents found, nothing to migrate")
+        client.close()
+        return
+
+    # Drop unique indexes on the legacy id first; migrated documents have no id
+    # field and would collide on null. The built-in _id index replaces them.
+    for name in COLLECTIONS:
+        indexes = await db[name].index_information()
+        for index_name, info in indexes.items():
+            if info["key"] == [("id", 1)]:
+                await db[name].drop_index(index_name)
+
+    for name, docs in legacy_docs.items():
+        if not docs:
+            continue
+
+        new_docs = []
+        for legacy_id, doc in docs.items():
+            new_doc = {key: value for key, value in doc.items() if key not in ("_id", "id")}
+            new_doc["_id"] = id_map[legacy_id]
+            new_doc["legacy_id"] = legacy_id
+            for field in REFERENCE_FIELDS:
+                if new_doc.get(field) in id_map:
+                    new_doc[field] = str(id_map[new_doc[field]])
+            new_docs.append(new_doc)
+
+        # Delete before inserting so unique indexes (e.g. users.email) don't collide
+        await db[name].delete_many({"id": {"$in": list(docs)}})
+        await db[name].insert_many(new_docs, ordered=False)
+        print(f"✅ Migrated {len(new_docs)} {name} documents")
+
+    print("✅ Migration complete; backups are in the *_pre_objectid collections")
+
+    # Close connection
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_object_ids())
@@ -1,16 +1,24 @@
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, status
+from fastapi import FastAPI, APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import os
+import asyncio
+import hashlib
+import time
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel, ConfigDict, Field, EmailStr
 from typing import List, Optional, Dict, Any
-import uuid
+from bson import ObjectId
 from datetime import datetime, timedelta
 import jwt
+from cachetools import TTLCache
 from passlib.context import CryptContext
 import bcrypt
 from enum import Enum
@@ -20,19 +28,51 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=200,
+    minPoolSize=20,
+    compressors="zstd,zlib",
+    zlibCompressionLevel=3,
+    serverSelectionTimeoutMS=3000,
+    retryWrites=True
+)
 db = client[os.environ['DB_NAME']]
 
 # Security
 SECRET_KEY = os.environ.get('SECRET_KEY', 'your-super-secret-key-change-in-production')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Enables helper routes used by the API test suite
+ENABLE_TEST_ENDPOINTS = os.environ.get('ENABLE_TEST_ENDPOINTS', 'false').lower() == 'true'
+# Each bcrypt round doubles hashing cost; 12 rounds is ~80ms per hash/verify
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+
+pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=BCRYPT_ROUNDS, deprecated="auto")
+# Dedicated pool for bcrypt work; requests beyond BCRYPT_MAX_PENDING get a 503
+BCRYPT_POOL = ThreadPoolExecutor(max_workers=2 * (os.cpu_count() or 1), thread_name_prefix="bcrypt")
+BCRYPT_MAX_PENDING = int(os.environ.get('BCRYPT_MAX_PENDING', '500'))
+bcrypt_pending = 0
 security = HTTPBearer()
 
+# Per-process cache of user documents keyed by user id
+USER_CACHE = TTLCache(maxsize=10_000, ttl=60)
+# Verified JWT payloads keyed by token digest; entries are still checked against exp
+TOKEN_CACHE = TTLCache(maxsize=50_000, ttl=300)
+
+# Audit logs are queued and bulk-written by a background task
+AUDIT_QUEUE: asyncio.Queue = asyncio.Queue()
+AUDIT_BATCH_SIZE = 50
+AUDIT_FLUSH_INTERVAL = 0.1
+audit_writer_task: Optional[asyncio.Task] = None
+audit_writer_stop = asyncio.Event()
+
 # Create the main app
-app = FastAPI(title="WaQteK HR Management System", version="1.0.0")
+app = FastAPI(
+    title="WaQteK HR Management System",
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
 
 # Create API router
 api_router = APIRouter(prefix="/api")
@@ -53,8 +93,23 @@ class Department(str, Enum):
     SALES = "Sales"
 
 # Models
-class User(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class MongoModel(BaseModel):
+    """Base for stored documents, keyed by an ObjectId in Mongo's _id."""
+    model_config = ConfigDict(populate_by_name=True)
+    
+    id: str = Field(default_factory=lambda: str(ObjectId()), alias="_id")
+    
+    def to_mongo(self) -> Dict[str, Any]:
+        doc = self.model_dump(by_alias=True)
+        doc["_id"] = ObjectId(doc["_id"])
+        return doc
+    
+    @classmethod
+    def from_mongo(cls, doc: Dict[str, Any]):
+        # Documents come from our own database, skip re-validation
+        return cls.model_construct(**{**doc, "_id": str(doc["_id"])})
+
+class User(MongoModel):
     email: EmailStr
     password_hash: str
     role: UserRole
@@ -71,8 +126,10 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
-class Employee(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class BatchLoginRequest(BaseModel):
+    logins: List[UserLogin] = Field(..., max_length=10)
+
+class Employee(MongoModel):
     user_id: str
     full_name: str
     email: EmailStr
@@ -96,8 +153,7 @@ class EmployeeCreate(BaseModel):
     password: str
     role: UserRole
 
-class LeaveBalance(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class LeaveBalance(MongoModel):
     employee_id: str
     year: int
     month: int
@@ -107,24 +163,25 @@ class LeaveBalance(BaseModel):
     closing_balance: float
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
-class LeaveAdjustment(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class LeaveAdjustment(MongoModel):
     employee_id: str
     adjustment_amount: float  # +1, -1, +0.5, -0.5
     reason: str
     adjusted_by: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
-class SickDays(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class LeaveAdjustmentRequest(BaseModel):
+    adjustment: float
+    reason: str
+
+class SickDays(MongoModel):
     employee_id: str
     year: int
     used_days: int = 0
     total_allowed: int = 3
     last_reset: datetime = Field(default_factory=datetime.utcnow)
 
-class AuditLog(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class AuditLog(MongoModel):
     user_id: str
     action: str
     target_type: str
@@ -151,12 +208,41 @@ class EmployeeResponse(BaseModel):
     sick_days_remaining: int
 
 # Utility functions
+def parse_object_id(value: str, detail: str) -> ObjectId:
+    if not ObjectId.is_valid(value):
+        raise HTTPException(status_code=404, detail=detail)
+    return ObjectId(value)
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+async def run_bcrypt(func, *args):
+    global bcrypt_pending
+    if bcrypt_pending >= BCRYPT_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry",
+            headers={"Retry-After": "1"}
+        )
+    bcrypt_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(BCRYPT_POOL, func, *args)
+    finally:
+        bcrypt_pending -= 1
+
+def decode_access_token(token: str) -> dict:
+    key = hashlib.blake2s(token.encode()).digest()[:16]
+    payload = TOKEN_CACHE.get(key)
+    if payload is not None and payload.get("exp", 0) > time.time():
+        return payload
+    
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    TOKEN_CACHE[key] = payload
+    return payload
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -169,16 +255,23 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(credentials.credentials)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Could not validate credentials")
         
-        user = await db.users.find_one({"id": user_id})
+        cached = USER_CACHE.get(user_id)
+        if cached is not None:
+            return User.from_mongo(cached)
+        
+        user = None
+        if ObjectId.is_valid(user_id):
+            user = await db.users.find_one({"_id": ObjectId(user_id)})
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
         
-        return User(**user)
+        USER_CACHE[user_id] = user
+        return User.from_mongo(user)
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
 
@@ -192,7 +285,7 @@ def require_role(allowed_roles: List[UserRole]):
         return current_user
     return role_checker
 
-async def log_audit(user_id: str, action: str, target_type: str, target_id: str, details: Dict[str, Any]):
+def log_audit(user_id: str, action: str, target_type: str, target_id: str, details: Dict[str, Any]):
     audit_log = AuditLog(
         user_id=user_id,
         action=action,
@@ -200,13 +293,37 @@ async def log_audit(user_id: str, action: str, target_type: str, target_id: str,
         target_id=target_id,
         details=details
     )
-    await db.audit_logs.insert_one(audit_log.dict())
+    AUDIT_QUEUE.put_nowait(audit_log.to_mongo())
+
+async def insert_leave_adjustment(doc: Dict[str, Any]):
+    # Motor methods return futures rather than being coroutine functions, so
+    # BackgroundTasks would run them in a worker thread with no event loop
+    await db.leave_adjustments.insert_one(doc)
+
+async def flush_audit_logs():
+    while not AUDIT_QUEUE.empty():
+        batch = []
+        while not AUDIT_QUEUE.empty() and len(batch) < AUDIT_BATCH_SIZE:
+            batch.append(AUDIT_QUEUE.get_nowait())
+        await db.audit_logs.insert_many(batch, ordered=False)
+
+async def audit_writer():
+    while not audit_writer_stop.is_set():
+        # Wake early on shutdown so the final flush happens here, never mid-batch
+        try:
+            await asyncio.wait_for(audit_writer_stop.wait(), AUDIT_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        try:
+            await flush_audit_logs()
+        except Exception:
+            logger.exception("Failed to write audit logs")
 
 # Authentication endpoints
 @api_router.post("/auth/login", response_model=Token)
 async def login(user_credentials: UserLogin):
     user = await db.users.find_one({"email": user_credentials.email})
-    if not user or not verify_password(user_credentials.password, user["password_hash"]):
+    if not user or not await run_bcrypt(verify_password, user_credentials.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -218,14 +335,17 @@ async def login(user_credentials: UserLogin):
             detail="User account is disabled"
         )
     
+    user_id = str(user["_id"])
+    
     # Update last login
     await db.users.update_one(
-        {"id": user["id"]},
+        {"_id": user["_id"]},
         {"$set": {"last_login": datetime.utcnow()}}
     )
+    USER_CACHE.pop(user_id, None)
     
-    access_token = create_access_token(data={"sub": user["id"]})
-    await log_audit(user["id"], "LOGIN", "user", user["id"], {"email": user["email"]})
+    access_token = create_access_token(data={"sub": user_id})
+    log_audit(user_id, "LOGIN", "user", user_id, {"email": user["email"]})
     
     return {
         "access_token": access_token,
@@ -233,6 +353,14 @@ async def login(user_credentials: UserLogin):
         "user_role": user["role"]
     }
 
+@api_router.post("/auth/test-login-batch", response_model=List[Token])
+async def login_batch(request: BatchLoginRequest):
+    # Test-only: bootstrap several accounts in one round-trip
+    if not ENABLE_TEST_ENDPOINTS:
+        raise HTTPException(status_code=404, detail="Not Found")
+    
+    return await asyncio.gather(*[login(credentials) for credentials in request.logins])
+
 @api_router.get("/auth/me")
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     return {
@@ -260,10 +388,9 @@ async def create_employee(
     # Create user account
     user = User(
         email=employee_data.email,
-        password_hash=hash_password(employee_data.password),
+        password_hash=await run_bcrypt(hash_password, employee_data.password),
         role=employee_data.role
     )
-    await db.users.insert_one(user.dict())
     
     # Create employee record
     employee = Employee(
@@ -277,7 +404,6 @@ async def create_employee(
         initial_leave_balance=employee_data.initial_leave_balance,
         created_by=current_user.id
     )
-    await db.employees.insert_one(employee.dict())
     
     # Initialize leave balance
     current_date = datetime.utcnow()
@@ -288,16 +414,37 @@ async def create_employee(
         opening_balance=employee_data.initial_leave_balance,
         closing_balance=employee_data.initial_leave_balance
     )
-    await db.leave_balances.insert_one(leave_balance.dict())
     
     # Initialize sick days
     sick_days = SickDays(
         employee_id=employee.id,
         year=current_date.year
     )
-    await db.sick_days.insert_one(sick_days.dict())
     
-    await log_audit(
+    # IDs are generated client-side, so the four inserts are independent
+    results = await asyncio.gather(
+        db.users.insert_one(user.to_mongo()),
+        db.employees.insert_one(employee.to_mongo()),
+        db.leave_balances.insert_one(leave_balance.to_mongo()),
+        db.sick_days.insert_one(sick_days.to_mongo()),
+        return_exceptions=True
+    )
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        # Roll back whichever inserts succeeded
+        await asyncio.gather(
+            db.users.delete_one({"_id": ObjectId(user.id)}),
+            db.employees.delete_one({"_id": ObjectId(employee.id)}),
+            db.leave_balances.delete_one({"_id": ObjectId(leave_balance.id)}),
+            db.sick_days.delete_one({"_id": ObjectId(sick_days.id)}),
+            return_exceptions=True
+        )
+        # The unique users.email index catches a signup racing the check above
+        if any(isinstance(error, DuplicateKeyError) for error in errors):
+            raise HTTPException(status_code=400, detail="User with this email already exists")
+        raise errors[0]
+    
+    log_audit(
         current_user.id,
         "CREATE_EMPLOYEE",
         "employee",
@@ -314,80 +461,100 @@ async def create_employee(
         hire_date=employee.hire_date,
         phone_number=employee.phone_number,
         current_leave_balance=employee_data.initial_leave_balance,
-        sick_days_used=0,
-        sick_days_remaining=3
+        sick_days_used=sick_days.used_days,
+        sick_days_remaining=sick_days.total_allowed - sick_days.used_days
     )
 
 @api_router.get("/employees", response_model=List[EmployeeResponse])
 async def get_employees(
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.HR, UserRole.MANAGER]))
 ):
-    employees = await db.employees.find({"is_active": True}).to_list(1000)
+    # Join current leave balance and sick days in a single query
+    current_date = datetime.utcnow()
+    pipeline = [
+        {"$match": {"is_active": True}},
+        {"$limit": 1000},
+        {"$lookup": {
+            "from": "leave_balances",
+            "let": {"eid": {"$toString": "$_id"}},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$employee_id", "$$eid"]},
+                    {"$eq": ["$year", current_date.year]},
+                    {"$eq": ["$month", current_date.month]}
+                ]}}},
+                {"$limit": 1}
+            ],
+            "as": "lb"
+        }},
+        {"$lookup": {
+            "from": "sick_days",
+            "let": {"eid": {"$toString": "$_id"}},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$employee_id", "$$eid"]},
+                    {"$eq": ["$year", current_date.year]}
+                ]}}},
+                {"$limit": 1}
+            ],
+            "as": "sd"
+        }}
+    ]
     response = []
     
-    for emp in employees:
-        # Get current leave balance
-        current_date = datetime.utcnow()
-        leave_balance = await db.leave_balances.find_one({
-            "employee_id": emp["id"],
-            "year": current_date.year,
-            "month": current_date.month
-        })
+    async for emp in db.employees.aggregate(pipeline):
+        current_balance = emp["lb"][0]["closing_balance"] if emp["lb"] else 0.0
+        sick_days_used = emp["sd"][0]["used_days"] if emp["sd"] else 0
+        sick_days_allowed = emp["sd"][0]["total_allowed"] if emp["sd"] else 3
         
-        current_balance = leave_balance["closing_balance"] if leave_balance else 0.0
-        
-        # Get sick days
-        sick_days = await db.sick_days.find_one({
-            "employee_id": emp["id"],
-            "year": current_date.year
+        response.append({
+            "id": str(emp["_id"]),
+            "full_name": emp["full_name"],
+            "email": emp["email"],
+            "department": emp["department"],
+            "position": emp["position"],
+            "hire_date": emp["hire_date"],
+            "phone_number": emp["phone_number"],
+            "current_leave_balance": float(current_balance),
+            "sick_days_used": int(sick_days_used),
+            "sick_days_remaining": int(sick_days_allowed) - int(sick_days_used)
         })
-        
-        sick_days_used = sick_days["used_days"] if sick_days else 0
-        
-        response.append(EmployeeResponse(
-            id=emp["id"],
-            full_name=emp["full_name"],
-            email=emp["email"],
-            department=emp["department"],
-            position=emp["position"],
-            hire_date=emp["hire_date"],
-            phone_number=emp["phone_number"],
-            current_leave_balance=current_balance,
-            sick_days_used=sick_days_used,
-            sick_days_remaining=3 - sick_days_used
-        ))
     
-    return response
+    # Trusted database output, serialize directly and skip response_model validation
+    return ORJSONResponse(response)
 
 @api_router.get("/employees/{employee_id}", response_model=EmployeeResponse)
 async def get_employee(
     employee_id: str,
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.HR, UserRole.MANAGER]))
 ):
-    employee = await db.employees.find_one({"id": employee_id, "is_active": True})
+    employee = await db.employees.find_one({
+        "_id": parse_object_id(employee_id, "Employee not found"),
+        "is_active": True
+    })
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    # Get current leave balance
+    # Get current leave balance and sick days concurrently
     current_date = datetime.utcnow()
-    leave_balance = await db.leave_balances.find_one({
-        "employee_id": employee_id,
-        "year": current_date.year,
-        "month": current_date.month
-    })
+    leave_balance, sick_days = await asyncio.gather(
+        db.leave_balances.find_one({
+            "employee_id": employee_id,
+            "year": current_date.year,
+            "month": current_date.month
+        }),
+        db.sick_days.find_one({
+            "employee_id": employee_id,
+            "year": current_date.year
+        })
+    )
     
     current_balance = leave_balance["closing_balance"] if leave_balance else 0.0
-    
-    # Get sick days
-    sick_days = await db.sick_days.find_one({
-        "employee_id": employee_id,
-        "year": current_date.year
-    })
-    
     sick_days_used = sick_days["used_days"] if sick_days else 0
+    sick_days_allowed = sick_days["total_allowed"] if sick_days else 3
     
     return EmployeeResponse(
-        id=employee["id"],
+        id=str(employee["_id"]),
         full_name=employee["full_name"],
         email=employee["email"],
         department=employee["department"],
@@ -396,56 +563,54 @@ async def get_employee(
         phone_number=employee["phone_number"],
         current_leave_balance=current_balance,
         sick_days_used=sick_days_used,
-        sick_days_remaining=3 - sick_days_used
+        sick_days_remaining=sick_days_allowed - sick_days_used
     )
 
 # Leave management endpoints
 @api_router.post("/leave/adjust/{employee_id}")
 async def adjust_leave_balance(
     employee_id: str,
-    adjustment: float,
-    reason: str,
+    request: LeaveAdjustmentRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.HR]))
 ):
+    adjustment = request.adjustment
+    reason = request.reason
+    
     # Validate adjustment amount
     if adjustment not in [1.0, -1.0, 0.5, -0.5]:
         raise HTTPException(status_code=400, detail="Invalid adjustment amount")
     
     # Check if employee exists
-    employee = await db.employees.find_one({"id": employee_id, "is_active": True})
+    employee = await db.employees.find_one({
+        "_id": parse_object_id(employee_id, "Employee not found"),
+        "is_active": True
+    })
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    # Get or create current month's leave balance
+    # Atomically create the current month's balance if missing and apply the adjustment;
+    # the filter matches the unique index, so concurrent upserts are retried by the server
     current_date = datetime.utcnow()
-    leave_balance = await db.leave_balances.find_one({
-        "employee_id": employee_id,
-        "year": current_date.year,
-        "month": current_date.month
-    })
-    
-    if not leave_balance:
-        # Create new balance record
-        leave_balance = LeaveBalance(
-            employee_id=employee_id,
-            year=current_date.year,
-            month=current_date.month,
-            opening_balance=0.0,
-            closing_balance=0.0
-        )
-        await db.leave_balances.insert_one(leave_balance.dict())
-    
-    # Calculate new balance
-    new_balance = leave_balance["closing_balance"] + adjustment
-    
-    # Update leave balance
-    await db.leave_balances.update_one(
-        {"id": leave_balance["id"]},
+    updated_balance = await db.leave_balances.find_one_and_update(
         {
-            "$set": {"closing_balance": new_balance},
-            "$inc": {"hr_adjustments": adjustment}
-        }
+            "employee_id": employee_id,
+            "year": current_date.year,
+            "month": current_date.month
+        },
+        {
+            "$inc": {"closing_balance": adjustment, "hr_adjustments": adjustment},
+            "$setOnInsert": {
+                "_id": ObjectId(),
+                "opening_balance": 0.0,
+                "leave_taken": 0.0,
+                "created_at": current_date
+            }
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER
     )
+    new_balance = updated_balance["closing_balance"]
     
     # Record adjustment
     adjustment_record = LeaveAdjustment(
@@ -454,9 +619,10 @@ async def adjust_leave_balance(
         reason=reason,
         adjusted_by=current_user.id
     )
-    await db.leave_adjustments.insert_one(adjustment_record.dict())
+    # The adjustment record does not affect the response, write it after responding
+    background_tasks.add_task(insert_leave_adjustment, adjustment_record.to_mongo())
     
-    await log_audit(
+    log_audit(
         current_user.id,
         "ADJUST_LEAVE_BALANCE",
         "employee",
@@ -475,22 +641,14 @@ async def adjust_leave_balance(
         "adjustment": adjustment
     }
 
-class LeaveAdjustmentRequest(BaseModel):
-    adjustment: float
-    reason: str
-
-@api_router.post("/leave/adjust/{employee_id}/body")
-async def adjust_leave_balance_body(
-    employee_id: str,
-    request: LeaveAdjustmentRequest,
-    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.HR]))
-):
-    return await adjust_leave_balance(employee_id, request.adjustment, request.reason, current_user)
-
 # Health check
 @api_router.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "WaQteK HR Management System"}
+    return {
+        "status": "healthy",
+        "service": "WaQteK HR Management System",
+        "bcrypt_pending": bcrypt_pending
+    }
 
 # Include router
 app.include_router(api_router)
@@ -511,9 +669,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_indexes():
+    # create_index is a no-op when the index already exists
+    await db.users.create_index("email", unique=True)
+    await db.employees.create_index([("is_active", 1)])
+    await db.leave_balances.create_index([("employee_id", 1), ("year", 1), ("month", 1)], unique=True)
+    await db.sick_days.create_index([("employee_id", 1), ("year", 1)], unique=True)
+    await db.audit_logs.create_index([("timestamp", -1)])
+
+@app.on_event("startup")
+async def start_audit_writer():
+    global audit_writer_task
+    audit_writer_task = asyncio.create_task(audit_writer())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if audit_writer_task is not None:
+        # Stop the writer and wait for its in-flight batch and final flush
+        audit_writer_stop.set()
+        await asyncio.gather(audit_writer_task, return_exceptions=True)
+    await flush_audit_logs()
     client.close()
+    BCRYPT_POOL.shutdown(wait=False)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,9 +1,65 @@
-import requests
+"""WaQteK HR backend API tests.
+
+Each test is independent and logs in once per class, so the suite can be
+spread across processes with pytest-xdist:
+
+    pytest -n 6 backend_test.py
+
+When the backend runs with ENABLE_TEST_ENDPOINTS=true, export the same variable
+here so setUpClass logs in through /auth/test-login-batch and test_07 checks it.
+"""
+import asyncio
+import logging
+import os
+import time
+import httpx
 import unittest
-import json
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 from datetime import datetime
 
-class WaQteKHRSystemTest(unittest.TestCase):
+# Per-step progress goes through logging; set TEST_LOG_LEVEL=WARNING in CI to silence it
+log = logging.getLogger(__name__)
+log.setLevel(os.environ.get("TEST_LOG_LEVEL", "INFO"))
+
+# Retry transient gateway errors from the preview host with exponential backoff
+RETRY_STATUSES = {502, 503, 504}
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.3
+HTTP_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=4)
+# Set when the backend under test runs with ENABLE_TEST_ENDPOINTS=true
+TEST_ENDPOINTS_ENABLED = os.environ.get("ENABLE_TEST_ENDPOINTS", "false").lower() == "true"
+
+# Request bodies are pre-serialized with orjson and sent as raw content
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+class RetryTransport(httpx.HTTPTransport):
+    def handle_request(self, request):
+        for attempt in range(RETRY_TOTAL):
+            response = super().handle_request(request)
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            response.close()
+            time.sleep(RETRY_BACKOFF * 2 ** attempt)
+        return super().handle_request(request)
+
+class AsyncRetryTransport(httpx.AsyncHTTPTransport):
+    async def handle_async_request(self, request):
+        for attempt in range(RETRY_TOTAL):
+            response = await super().handle_async_request(request)
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            await response.aclose()
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+        return await super().handle_async_request(request)
+
+REQUIRED_EMPLOYEE_FIELDS = frozenset([
+    "id", "full_name", "email", "department", "position",
+    "hire_date", "phone_number", "current_leave_balance",
+    "sick_days_used", "sick_days_remaining"
+])
+
+class WaQteKHRSystemTest(unittest.IsolatedAsyncioTestCase):
     @classmethod
     def setUpClass(cls):
         cls.base_url = "https://ed1618e0-3d7a-4bce-83c6-5e559a2200ad.preview.emergentagent.com/api"
@@ -13,170 +69,240 @@ class WaQteKHRSystemTest(unittest.TestCase):
         cls.employee_credentials = {"email": "emp1@waqtek.com", "password": "emp123"}
         cls.tokens = {}
         
+        # Shared HTTP/2 client multiplexes all requests over one connection to the preview host
+        cls.client = httpx.Client(
+            base_url=cls.base_url,
+            transport=RetryTransport(http2=True, limits=HTTP_LIMITS, retries=RETRY_TOTAL),
+            headers=JSON_HEADERS,
+            timeout=10
+        )
+        
         # Login with all roles and store tokens
-        print("Logging in with all roles...")
+        log.info("Logging in with all roles...")
         
-        # Admin login
-        response = requests.post(f"{cls.base_url}/auth/login", json=cls.admin_credentials)
-        if response.status_code == 200:
-            data = response.json()
-            cls.tokens["admin"] = data["access_token"]
-            print("✅ Admin login successful")
-        else:
-            print(f"❌ Admin login failed: {response.text}")
+        creds = [
+            ("admin", "Admin", cls.admin_credentials),
+            ("hr", "HR", cls.hr_credentials),
+            ("manager", "Manager", cls.manager_credentials),
+            ("employee", "Employee", cls.employee_credentials),
+        ]
         
-        # HR login
-        response = requests.post(f"{cls.base_url}/auth/login", json=cls.hr_credentials)
-        if response.status_code == 200:
-            data = response.json()
-            cls.tokens["hr"] = data["access_token"]
-            print("✅ HR login successful")
+        # Log in all roles in one round-trip when the batch endpoint is enabled;
+        # test_07 fails if it is enabled but not working
+        cls.batch_login_response = None
+        if TEST_ENDPOINTS_ENABLED:
+            cls.batch_login_response = cls._login_batch(creds)
+        if cls.batch_login_response is not None and cls.batch_login_response.status_code == 200:
+            for (role, label, _), data in zip(creds, cls.batch_login_response.json()):
+                cls.tokens[role] = data["access_token"]
+                log.info("%s login successful", label)
         else:
-            print(f"❌ HR login failed: {response.text}")
+            cls._login_individually(creds)
         
-        # Manager login
-        response = requests.post(f"{cls.base_url}/auth/login", json=cls.manager_credentials)
-        if response.status_code == 200:
-            data = response.json()
-            cls.tokens["manager"] = data["access_token"]
-            print("✅ Manager login successful")
-        else:
-            print(f"❌ Manager login failed: {response.text}")
+        # Build the per-role auth headers once
+        cls.auth_headers = {
+            role: {"Authorization": f"Bearer {token}"} for role, token in cls.tokens.items()
+        }
         
-        # Employee login
-        response = requests.post(f"{cls.base_url}/auth/login", json=cls.employee_credentials)
-        if response.status_code == 200:
-            data = response.json()
-            cls.tokens["employee"] = data["access_token"]
-            print("✅ Employee login successful")
+        # Fetch the employee list once for tests that only need an employee ID;
+        # on failure those tests are skipped and the rest still run
+        cls.employees_list = []
+        cls.employee_id = None
+        cls.employee_id_error = None
+        if "hr" not in cls.auth_headers:
+            cls.employee_id_error = "HR login failed, no employee ID available"
         else:
-            print(f"❌ Employee login failed: {response.text}")
+            response = cls.client.get("/employees", headers=cls.auth_headers["hr"])
+            if response.status_code != 200:
+                cls.employee_id_error = (
+                    f"GET /employees as HR returned {response.status_code}: {response.text}"
+                )
+            else:
+                cls.employees_list = orjson.loads(response.content)
+                if cls.employees_list:
+                    cls.employee_id = cls.employees_list[0]["id"]
+                else:
+                    cls.employee_id_error = "GET /employees returned no employees"
+        if cls.employee_id_error:
+            log.error(cls.employee_id_error)
+    
+    @classmethod
+    def _login_batch(cls, creds):
+        return cls.client.post(
+            "/auth/test-login-batch",
+            content=orjson.dumps({"logins": [credentials for _, _, credentials in creds]})
+        )
+    
+    @classmethod
+    def _login_individually(cls, creds):
+        def _login(item):
+            role, label, credentials = item
+            response = cls.client.post("/auth/login", content=orjson.dumps(credentials))
+            return role, label, response
+        
+        # Fire all four logins concurrently over the shared client
+        with ThreadPoolExecutor(max_workers=len(creds)) as executor:
+            for role, label, response in executor.map(_login, creds):
+                if response.status_code == 200:
+                    data = response.json()
+                    cls.tokens[role] = data["access_token"]
+                    log.info("%s login successful", label)
+                else:
+                    log.error("%s login failed: %s", label, response.text)
+    
+    def require_employee_id(self):
+        if self.employee_id is None:
+            self.skipTest(self.employee_id_error)
+        return self.employee_id
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.close()
+    
+    def make_async_client(self):
+        """Async client for tests that fan out requests with asyncio.gather.
+
+        Created per test rather than in setUpClass because IsolatedAsyncioTestCase
+        runs every test on a fresh event loop, and an AsyncClient's pooled
+        connections are bound to the loop they were opened on.
+        """
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            transport=AsyncRetryTransport(http2=True, limits=HTTP_LIMITS, retries=RETRY_TOTAL),
+            headers=JSON_HEADERS,
+            timeout=10
+        )
     
     def test_01_health_check(self):
         """Test the health check endpoint"""
-        response = requests.get(f"{self.base_url}/health")
+        response = self.client.get("/health")
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertEqual(data["status"], "healthy")
         self.assertEqual(data["service"], "WaQteK HR Management System")
-        print("✅ Health check endpoint is working")
+        log.info("Health check endpoint is working")
     
     def test_02_get_current_user(self):
         """Test getting current user info"""
-        for role, token in self.tokens.items():
-            headers = {"Authorization": f"Bearer {token}"}
-            response = requests.get(f"{self.base_url}/auth/me", headers=headers)
+        for role, headers in self.auth_headers.items():
+            response = self.client.get("/auth/me", headers=headers)
             self.assertEqual(response.status_code, 200)
             data = response.json()
             self.assertEqual(data["role"], role)
-            print(f"✅ Get current user info for {role} successful")
+            log.debug("Get current user info for %s successful", role)
     
-    def test_03_get_employees_access_control(self):
+    async def test_03_get_employees_access_control(self):
         """Test role-based access control for getting employees"""
+        async with self.make_async_client() as client:
+            # Check all four roles concurrently
+            roles = ["admin", "hr", "manager", "employee"]
+            responses = dict(zip(roles, await asyncio.gather(*[
+                client.get("/employees", headers=self.auth_headers[role])
+                for role in roles
+            ])))
+        
         # Admin, HR, and Manager should be able to get employees
         for role in ["admin", "hr", "manager"]:
-            headers = {"Authorization": f"Bearer {self.tokens[role]}"}
-            response = requests.get(f"{self.base_url}/employees", headers=headers)
+            response = responses[role]
             self.assertEqual(response.status_code, 200)
-            employees = response.json()
+            employees = orjson.loads(response.content)
             self.assertIsInstance(employees, list)
-            print(f"✅ {role.capitalize()} can access employees list")
+            log.debug("%s can access employees list", role.capitalize())
         
         # Employee should not be able to get all employees
-        headers = {"Authorization": f"Bearer {self.tokens['employee']}"}
-        response = requests.get(f"{self.base_url}/employees", headers=headers)
-        self.assertEqual(response.status_code, 403)
-        print("✅ Employee cannot access employees list (correctly forbidden)")
+        self.assertEqual(responses["employee"].status_code, 403)
+        log.info("Employee cannot access employees list (correctly forbidden)")
     
-    def test_04_leave_adjustment_access_control(self):
+    async def test_04_leave_adjustment_access_control(self):
         """Test role-based access control for leave adjustments"""
-        # Get an employee ID first
-        headers = {"Authorization": f"Bearer {self.tokens['hr']}"}
-        response = requests.get(f"{self.base_url}/employees", headers=headers)
-        employees = response.json()
-        employee_id = employees[0]["id"]
-        
-        # Admin and HR should be able to adjust leave
-        for role in ["admin", "hr"]:
-            headers = {"Authorization": f"Bearer {self.tokens[role]}"}
-            adjustment_data = {"adjustment": 1, "reason": f"Test adjustment by {role}"}
-            response = requests.post(
-                f"{self.base_url}/leave/adjust/{employee_id}/body", 
-                json=adjustment_data,
-                headers=headers
-            )
-            self.assertEqual(response.status_code, 200)
-            data = response.json()
-            self.assertEqual(data["adjustment"], 1)
-            print(f"✅ {role.capitalize()} can adjust leave balance")
-        
-        # Manager and Employee should not be able to adjust leave
-        for role in ["manager", "employee"]:
-            headers = {"Authorization": f"Bearer {self.tokens[role]}"}
-            adjustment_data = {"adjustment": 1, "reason": f"Test adjustment by {role}"}
-            response = requests.post(
-                f"{self.base_url}/leave/adjust/{employee_id}/body", 
-                json=adjustment_data,
-                headers=headers
-            )
-            self.assertEqual(response.status_code, 403)
-            print(f"✅ {role.capitalize()} cannot adjust leave balance (correctly forbidden)")
+        employee_id = self.require_employee_id()
+        async with self.make_async_client() as client:
+            def adjust_as(role):
+                return client.post(
+                    f"/leave/adjust/{employee_id}",
+                    content=orjson.dumps({"adjustment": 1, "reason": f"Test adjustment by {role}"}),
+                    headers=self.auth_headers[role]
+                )
+        
+            # Admin and HR should be able to adjust leave
+            allowed_roles = ["admin", "hr"]
+            responses = await asyncio.gather(*[adjust_as(role) for role in allowed_roles])
+            for role, response in zip(allowed_roles, responses):
+                self.assertEqual(response.status_code, 200)
+                data = response.json()
+                self.assertEqual(data["adjustment"], 1)
+                log.debug("%s can adjust leave balance", role.capitalize())
+        
+            # Manager and Employee should not be able to adjust leave
+            forbidden_roles = ["manager", "employee"]
+            responses = await asyncio.gather(*[adjust_as(role) for role in forbidden_roles])
+            for role, response in zip(forbidden_roles, responses):
+                self.assertEqual(response.status_code, 403)
+                log.debug("%s cannot adjust leave balance (correctly forbidden)", role.capitalize())
     
-    def test_05_leave_adjustment_validation(self):
+    async def test_05_leave_adjustment_validation(self):
         """Test validation for leave adjustments"""
-        # Get an employee ID first
-        headers = {"Authorization": f"Bearer {self.tokens['hr']}"}
-        response = requests.get(f"{self.base_url}/employees", headers=headers)
-        employees = response.json()
-        employee_id = employees[0]["id"]
-        
-        # Test valid adjustment amounts
-        valid_adjustments = [1.0, 0.5, -0.5, -1.0]
-        for adjustment in valid_adjustments:
-            adjustment_data = {"adjustment": adjustment, "reason": f"Test adjustment of {adjustment}"}
-            response = requests.post(
-                f"{self.base_url}/leave/adjust/{employee_id}/body", 
-                json=adjustment_data,
+        employee_id = self.require_employee_id()
+        headers = self.auth_headers["hr"]
+        
+        async with self.make_async_client() as client:
+            # Test valid adjustment amounts, all in flight at once
+            valid_adjustments = [1.0, 0.5, -0.5, -1.0]
+            responses = await asyncio.gather(*[
+                client.post(
+                    f"/leave/adjust/{employee_id}",
+                    content=orjson.dumps({"adjustment": adjustment, "reason": f"Test adjustment of {adjustment}"}),
+                    headers=headers
+                )
+                for adjustment in valid_adjustments
+            ])
+            for adjustment, response in zip(valid_adjustments, responses):
+                self.assertEqual(response.status_code, 200)
+                log.debug("Valid adjustment of %s accepted", adjustment)
+        
+            # Test invalid adjustment amount
+            invalid_adjustment = orjson.dumps({"adjustment": 2, "reason": "Invalid adjustment"})
+            response = await client.post(
+                f"/leave/adjust/{employee_id}", 
+                content=invalid_adjustment,
                 headers=headers
             )
-            self.assertEqual(response.status_code, 200)
-            print(f"✅ Valid adjustment of {adjustment} accepted")
-        
-        # Test invalid adjustment amount
-        invalid_adjustment = {"adjustment": 2, "reason": "Invalid adjustment"}
-        response = requests.post(
-            f"{self.base_url}/leave/adjust/{employee_id}/body", 
-            json=invalid_adjustment,
-            headers=headers
-        )
-        self.assertEqual(response.status_code, 400)
-        print("✅ Invalid adjustment amount correctly rejected")
+            self.assertEqual(response.status_code, 400)
+            log.info("Invalid adjustment amount correctly rejected")
     
     def test_06_employee_details(self):
         """Test getting employee details"""
-        # Get an employee ID first
-        headers = {"Authorization": f"Bearer {self.tokens['hr']}"}
-        response = requests.get(f"{self.base_url}/employees", headers=headers)
-        employees = response.json()
-        employee_id = employees[0]["id"]
+        employee_id = self.require_employee_id()
+        headers = self.auth_headers["hr"]
         
         # Get employee details
-        response = requests.get(f"{self.base_url}/employees/{employee_id}", headers=headers)
+        response = self.client.get(f"/employees/{employee_id}", headers=headers)
         self.assertEqual(response.status_code, 200)
         employee = response.json()
         
         # Verify employee data structure
-        required_fields = [
-            "id", "full_name", "email", "department", "position", 
-            "hire_date", "phone_number", "current_leave_balance",
-            "sick_days_used", "sick_days_remaining"
-        ]
-        for field in required_fields:
-            self.assertIn(field, employee)
+        missing = REQUIRED_EMPLOYEE_FIELDS - employee.keys()
+        self.assertFalse(missing, f"missing fields: {missing}")
         
         # Verify sick days calculation
         self.assertEqual(employee["sick_days_remaining"], 3 - employee["sick_days_used"])
-        print("✅ Employee details retrieved successfully with correct structure")
+        
+        # Details should agree with the employee's entry in the list fetched in
+        # setUpClass; balances are left out since earlier tests adjust them
+        listed = next(item for item in self.employees_list if item["id"] == employee_id)
+        for field in ("full_name", "email", "department", "position", "hire_date", "phone_number"):
+            self.assertEqual(employee[field], listed[field], field)
+        log.info("Employee details retrieved successfully with correct structure")
+    
+    def test_07_batch_login_endpoint(self):
+        """Test the test-only batch login endpoint when it is enabled"""
+        if not TEST_ENDPOINTS_ENABLED:
+            self.skipTest("ENABLE_TEST_ENDPOINTS is not set")
+        response = self.batch_login_response
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(len(response.json()), 4)
+        log.info("Batch login endpoint returned a token for every role")
 
 if __name__ == "__main__":
-    unittest.main(argv=['first-arg-is-ignored'], exit=False)
\ No newline at end of file
+    logging.basicConfig(format="%(message)s")
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
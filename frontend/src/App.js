@@ -434,7 +434,7 @@ const Dashboard = () => {
   const adjustLeaveBalance = async (employeeId, adjustment, reason) => {
     try {
       const token = localStorage.getItem('token');
-      await axios.post(`${API}/leave/adjust/${employeeId}/body`, 
+      await axios.post(`${API}/leave/adjust/${employeeId}`, 
         { adjustment, reason },
         {
           headers: { Authorization: `Bearer ${token}`, 'Content-Type': 'application/json' }
@@ -0,0 +1,109 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+from starlette.background import BackgroundTasks
+
+sys.path.append(str(Path(__file__).parent.parent / "backend"))
+
+import server
+
+
+class MotorLikeCollection:
+    """Mimics Motor: insert_one is a plain function returning a future on the running loop."""
+
+    def __init__(self):
+        self.docs = []
+
+    def insert_one(self, doc):
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self.docs.append(doc)
+        future.set_result(None)
+        return future
+
+
+class FakeDB:
+    def __init__(self):
+        self.leave_adjustments = MotorLikeCollection()
+
+
+class InsertOnlyCollection:
+    """Async collection that records inserts, optionally failing them with `error`."""
+
+    def __init__(self, error=None):
+        self.docs = []
+        self.error = error
+
+    async def find_one(self, query):
+        return None
+
+    async def insert_one(self, doc):
+        if self.error:
+            raise self.error
+        self.docs.append(doc)
+
+    async def delete_one(self, query):
+        self.docs = [doc for doc in self.docs if doc["_id"] != query["_id"]]
+
+
+class RacingSignupDB:
+    """The email pre-check passes, but the unique users.email index rejects the insert."""
+
+    def __init__(self):
+        self.users = InsertOnlyCollection(DuplicateKeyError("E11000 duplicate key error"))
+        self.employees = InsertOnlyCollection()
+        self.leave_balances = InsertOnlyCollection()
+        self.sick_days = InsertOnlyCollection()
+
+
+class CreateEmployeeDuplicateEmailTest(unittest.TestCase):
+    def test_duplicate_key_on_insert_returns_400_and_rolls_back(self):
+        """A duplicate email caught by the unique index is a 400, not a raw DuplicateKeyError"""
+        fake_db = RacingSignupDB()
+        original_db = server.db
+        server.db = fake_db
+        employee_data = server.EmployeeCreate(
+            email="dup@waqtek.com",
+            password="password123",
+            role=server.UserRole.EMPLOYEE,
+            full_name="Duplicate User",
+            department=server.Department.IT,
+            position="Developer",
+            hire_date="2024-01-01T00:00:00",
+            phone_number="+966500000000",
+            initial_leave_balance=21.0
+        )
+        current_user = server.User(email="hr@waqtek.com", password_hash="hash", role=server.UserRole.HR)
+        try:
+            with self.assertRaises(HTTPException) as context:
+                asyncio.run(server.create_employee(employee_data, current_user=current_user))
+        finally:
+            server.db = original_db
+        self.assertEqual(context.exception.status_code, 400)
+        self.assertEqual(context.exception.detail, "User with this email already exists")
+        self.assertEqual(fake_db.employees.docs, [])
+        self.assertEqual(fake_db.leave_balances.docs, [])
+        self.assertEqual(fake_db.sick_days.docs, [])
+
+
+class LeaveAdjustmentBackgroundTaskTest(unittest.TestCase):
+    def test_adjustment_record_is_written_by_background_task(self):
+        """The adjustment record must land when run through FastAPI's BackgroundTasks"""
+        fake_db = FakeDB()
+        original_db = server.db
+        server.db = fake_db
+        try:
+            tasks = BackgroundTasks()
+            tasks.add_task(server.insert_leave_adjustment, {"reason": "test"})
+            asyncio.run(tasks())
+        finally:
+            server.db = original_db
+        self.assertEqual(fake_db.leave_adjustments.docs, [{"reason": "test"}])
+
+
+if __name__ == "__main__":
+    unittest.main()